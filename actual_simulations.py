@@ -76,7 +76,7 @@ def get_random_hiker_position(n: float):
 	return Position(r * math.cos(theta), r * math.sin(theta))
 
 def probe_query(probe: Circle, hiker: Position):
-	return math.sqrt((probe.x - hiker.x)**2 + (probe.y - hiker.y)**2) < probe.r + PRECISION.epsilon
+	return math.dist((probe.x, probe.y), hiker) < probe.r + PRECISION.epsilon
 
 def scale_translate_and_rotate_probes(placement: list[Circle], search_area: Circle, drone: Position) -> list[Circle]:
 	# # first, scale and translate the probes
@@ -84,11 +84,9 @@ def scale_translate_and_rotate_probes(placement: list[Circle], search_area: Circ
 
 	# first, rotate the probes, such that the drone is as close to the first probe as possible
 	# find the angle between the first probe and the drone
-	first_x, first_y, _ = placement[0]
-	first_probe_angle = math.atan2(first_y, first_x)
+	first_probe_angle = math.atan2(placement[0].y, placement[0].x)
 
-	origin_x, origin_y, _ = search_area
-	drone_angle = math.atan2(drone.y - origin_y, drone.x - origin_x)
+	drone_angle = math.atan2(drone.y - search_area.y, drone.x - search_area.x)
 
 	angle = drone_angle - first_probe_angle
 
@@ -1,33 +1,51 @@
-from collections import deque
-from dataclasses import dataclass
-from typing import Generator, NamedTuple, TypedDict, Callable
+from dataclasses import dataclass, field
+import functools
+from typing import Generator, Iterable, NamedTuple, TypedDict, Callable
 import matplotlib
 matplotlib.use('TkAgg')
-from matplotlib import patches
+from matplotlib import collections, patches
 import matplotlib.pyplot as plt
 from matplotlib.axes import Axes
 from matplotlib.patches import Circle as PltCircle
 from shapely import Polygon
 import shapely
 import math
+import numpy as np
+from numba import njit
 
 OKABE_COLORS = ['#000000', '#E69F00', '#56B4E9', '#009E73', '#F0E442', '#0072B2', '#D55E00', '#CC79A7']
 plt.rcParams['axes.prop_cycle'] = plt.cycler(color=OKABE_COLORS) # type: ignore
 
-class Circle(NamedTuple):
+class _CircleFields(NamedTuple):
     x: float
     y: float
     r: float
+    r2: float
+
+class Circle(_CircleFields):
+    """A circle centered at (x, y) with radius r. The squared radius r2 is computed once on construction."""
+    __slots__ = ()
+
+    def __new__(cls, x: float, y: float, r: float):
+        return super().__new__(cls, x, y, r, r * r)
+
+    @classmethod
+    def _make(cls, iterable: Iterable[float]) -> 'Circle':
+        # Recompute r2 so that _replace(r=...) stays consistent
+        x, y, r, *_ = iterable
+        return cls(x, y, r)
+
+    def __getnewargs__(self):
+        return self.x, self.y, self.r
+
+    def __repr__(self) -> str:
+        return f'Circle(x={self.x!r}, y={self.y!r}, r={self.r!r})'
 
 class Square(NamedTuple):
     x: float
     y: float
     side_length: float
 
-class HorizontalLine(NamedTuple):
-    start: float
-    end: float
-
 class CirclesPlotKwargs(TypedDict, total=False):
     title: str | None
     p: float
@@ -36,11 +54,67 @@ class CirclesPlotKwargs(TypedDict, total=False):
 
 UNIT_CIRCLE = Circle(0.0, 0.0, 1.0)
 
+# Largest number of samples per axis used when rasterizing the unit square
+RASTER_MAX_RESOLUTION = 4096
+
+# Largest number of segments per quarter circle used when building circle polygons
+MAX_QUAD_SEGS = 2 ** 20
+
+# Circle polygons with at most this many segments per quarter circle are cached. This covers every circle at the
+# default epsilon of 1e-3, while the larger polygons built at the finer epsilons of simulations.py would take up to
+# 64 MB each and are rebuilt instead.
+MAX_CACHED_QUAD_SEGS = 4096
+
+# Number of circle polygons kept in the cache, at most about 64 MB of vertices
+MAX_CACHED_POLYGONS = 256
+
+# Number of scanlines covers_unit_circle_2 evaluates at once
+SCANLINE_CHUNK_SIZE = 4096
+
+# Number of bit-reversal levels of scanlines covers_unit_circle_2 checks before sweeping all of them
+COARSE_SCANLINE_LEVELS = 4
+
+# Number of cells per axis of the grid covers_unit_circle_3 splits the unit circle into when it falls back to polygons
+COVERAGE_GRID_SIZE = 32
+
+@dataclass
+class CircleArray:
+    """Structure-of-arrays view of a list of circles, used by the vectorized coverage checks."""
+    cx: np.ndarray
+    cy: np.ndarray
+    r2: np.ndarray
+    # Rows are the x_min, y_min, x_max, y_max of the bounding box of each circle
+    bounds: np.ndarray
+
+    @classmethod
+    def from_circles(cls, circles: list[Circle]) -> 'CircleArray':
+        cx = np.array([circle.x for circle in circles], dtype=np.float64)
+        cy = np.array([circle.y for circle in circles], dtype=np.float64)
+        r = np.array([circle.r for circle in circles], dtype=np.float64)
+        r2 = np.array([circle.r2 for circle in circles], dtype=np.float64)
+
+        # Pad the bounding boxes so that rounding never prunes a circle covering a point on the edge of a square
+        padded_r = r + 1e-12
+        bounds = np.stack([cx - padded_r, cy - padded_r, cx + padded_r, cy + padded_r])
+
+        return cls(cx, cy, r2, bounds)
+
+def _buffer(x: float, y: float, r: float, quad_segs: int) -> Polygon:
+    return shapely.Point(x, y).buffer(r, quad_segs=quad_segs)
+
+@functools.lru_cache(maxsize=MAX_CACHED_POLYGONS)
+def _cached_buffer(_version: int, x: float, y: float, r: float, quad_segs: int) -> Polygon:
+    return _buffer(x, y, r, quad_segs)
+
 @dataclass
 class Precision:
     precision: int = 7
     epsilon: float = 1e-3
     unit_circle_polygon: Polygon = shapely.Point(0.0, 0.0).buffer(1.0)
+    raster_axis: tuple[int, np.ndarray | None] | None = field(default=None, repr=False)
+    unit_circle_cells: tuple[int, np.ndarray, np.ndarray, np.ndarray] | None = field(default=None, repr=False)
+    # Bumped on every precision change so that cached polygons and grids are never reused across precisions
+    version: int = field(default=0, repr=False)
 
     def __post_init__(self):
         self.unit_circle_polygon = self.get_circle_polygon(UNIT_CIRCLE)
@@ -51,12 +125,52 @@ class Precision:
 
         self.precision = precision
         self.epsilon = 1 / 10 ** (precision // 2)
+        self.version += 1
         self.unit_circle_polygon = self.get_circle_polygon(UNIT_CIRCLE)
 
-    def get_circle_polygon(self, circle: Circle) -> Polygon:
-        quad_segs = min(math.ceil(circle.r * math.pi / 2 / self.epsilon), 2 ** 20)
+    def get_polygon_parameters(self, circle: Circle) -> tuple[float, float, float, int]:
+        """Get the center and radius of the polygon approximating a circle and its number of segments per quadrant."""
+        quad_segs = min(math.ceil(circle.r * math.pi / 2 / self.epsilon), MAX_QUAD_SEGS)
+
+        return circle.x, circle.y, circle.r, quad_segs
 
-        return shapely.Point(circle.x, circle.y).buffer(circle.r, quad_segs=quad_segs)
+    def get_circle_polygon(self, circle: Circle) -> Polygon:
+        x, y, r, quad_segs = self.get_polygon_parameters(circle)
+        if quad_segs > MAX_CACHED_QUAD_SEGS:
+            return _buffer(x, y, r, quad_segs)
+
+        return _cached_buffer(self.version, x, y, r, quad_segs)
+
+    def get_raster_axis(self) -> np.ndarray | None:
+        """Get the sample coordinates of an epsilon-spaced grid over [-1, 1).
+        Returns None if epsilon is too fine for the grid to fit in RASTER_MAX_RESOLUTION samples per axis."""
+        if self.raster_axis is None or self.raster_axis[0] != self.version:
+            # np.arange(-1.0, 1.0, epsilon) has ceil(2 / epsilon) samples
+            too_fine = math.ceil(2 / self.epsilon) > RASTER_MAX_RESOLUTION
+            self.raster_axis = (self.version, None if too_fine else np.arange(-1.0, 1.0, self.epsilon))
+
+        return self.raster_axis[1]
+
+    def get_unit_circle_cells(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the nonempty pieces of the unit circle polygon clipped to a COVERAGE_GRID_SIZE grid over [-1, 1]^2,
+        the x_min, y_min, x_max, y_max bounds of their cells as rows, and their areas."""
+        if self.unit_circle_cells is None or self.unit_circle_cells[0] != self.version:
+            edges = np.linspace(-1.0, 1.0, COVERAGE_GRID_SIZE + 1)
+            x_min, y_min = (a.ravel() for a in np.meshgrid(edges[:-1], edges[:-1]))
+            x_max, y_max = (a.ravel() for a in np.meshgrid(edges[1:], edges[1:]))
+            bounds = np.stack([x_min, y_min, x_max, y_max])
+
+            # Only the cells on the boundary of the unit circle polygon need to be clipped to it
+            contains, reaches = get_polygon_cell_overlap(np.array([self.get_polygon_parameters(UNIT_CIRCLE)]), bounds)
+            cells = shapely.box(x_min, y_min, x_max, y_max)
+            for i in np.flatnonzero(reaches[0] & ~contains[0]):
+                cells[i] = shapely.clip_by_rect(self.unit_circle_polygon, *bounds[:, i])
+
+            nonempty = reaches[0] & ~shapely.is_empty(cells)
+            self.unit_circle_cells = (self.version, cells[nonempty], bounds[:, nonempty], shapely.area(cells[nonempty]))
+
+        _, cells, bounds, areas = self.unit_circle_cells
+        return cells, bounds, areas
 
 PRECISION = Precision()
 
@@ -78,20 +192,23 @@ def get_circles_plot(circles: list[Circle], *,
     # Draw unit circle with dashed lines in black
     ax.add_patch(PltCircle((0, 0), 1, fill=False, linestyle='--', color='black'))
 
-    # Draw the circles
-    for i, circle in enumerate(circles):
-        color = OKABE_COLORS[(i + 1) % len(OKABE_COLORS)]
-        ax.add_patch(PltCircle((circle.x, circle.y), circle.r, fill=False, color=color))
+    # Draw the circles as a single collection, then label them
+    colors = [OKABE_COLORS[(i + 1) % len(OKABE_COLORS)] for i in range(len(circles))]
+    ax.add_collection(collections.PatchCollection([PltCircle((circle.x, circle.y), circle.r) for circle in circles],
+                                                  facecolor='none', edgecolors=colors))
+    for i, (circle, color) in enumerate(zip(circles, colors)):
         ax.text(circle.x, circle.y, str(i + 1), # type: ignore
                 horizontalalignment='center', verticalalignment='center',
                 color=color, fontsize=18)
-        
-    for square in squares:
-        ax.add_patch(patches.Rectangle((square.x, square.y), square.side_length, square.side_length, fill=False, color='black'))
 
-    for polygon in polygons:
-        x, y = polygon.exterior.xy
-        ax.plot(x, y, color='black', linewidth=0.5) # type: ignore
+    if squares:
+        ax.add_collection(collections.PatchCollection(
+            [patches.Rectangle((square.x, square.y), square.side_length, square.side_length) for square in squares],
+            facecolor='none', edgecolors='black'))
+
+    if polygons:
+        ax.add_collection(collections.LineCollection([np.asarray(polygon.exterior.coords) for polygon in polygons],
+                                                     colors='black', linewidths=0.5))
 
     # Set plot limits and aspect ratio
     ax.set_xlim(-1.5, 1.5)
@@ -130,228 +247,464 @@ def draw_circles(circles: list[Circle], *,
     get_circles_plot(circles, title=title, p=p, c=c, ct=ct, cpu_time=cpu_time, squares=squares, polygons=polygons)
     plt.show() # type: ignore
 
-def get_horizontal_line(circle: Circle, y: float) -> HorizontalLine | None:
-    """Get the horizontal line that intersects the circle at y."""
-    if abs(y - circle.y) > circle.r:
-        return None
-
-    delta = (circle.r ** 2 - (y - circle.y) ** 2) ** 0.5
-    return HorizontalLine(circle.x - delta, circle.x + delta)
+def _covers_scanlines(cx: np.ndarray, cy: np.ndarray, r2: np.ndarray, ys: np.ndarray) -> bool:
+    """Check whether the circles, given as column vectors, cover the unit circle line at every y in ys."""
+    unit_delta = np.sqrt(1 - ys * ys)
+
+    # Clip each horizontal line to the unit circle line, dropping the ones that miss it
+    dy = ys - cy
+    delta = np.sqrt(np.maximum(r2 - dy * dy, 0))
+    starts = np.maximum(cx - delta, -unit_delta)
+    ends = np.minimum(cx + delta, unit_delta)
+    valid = (dy * dy <= r2) & (starts <= ends)
+    starts[~valid] = np.inf
+    ends[~valid] = -np.inf
+
+    # Sweep the lines by start coordinate, tracking the furthest end reached so far
+    order = np.argsort(starts, axis=0)
+    starts = np.take_along_axis(starts, order, axis=0)
+    reach = np.maximum.accumulate(np.take_along_axis(ends, order, axis=0), axis=0)
+
+    no_gaps = ((starts[1:] <= reach[:-1]) | (reach[:-1] >= unit_delta)).all(axis=0)
+    return bool((no_gaps & (starts[0] <= -unit_delta) & (reach[-1] >= unit_delta)).all())
+
+def get_coarse_scanlines(num_lines: int, levels: int = COARSE_SCANLINE_LEVELS) -> np.ndarray:
+    """Get the indices of the first and last scanlines followed by those at the dyadic fractions of the range
+    in bit-reversal order (1/2, 1/4, 3/4, 1/8, ...), up to the given number of levels, without repeats."""
+    fractions = [0.0, 1.0] + [j / 2 ** level for level in range(1, levels + 1) for j in range(1, 2 ** level, 2)]
+    indices = [round(fraction * (num_lines - 1)) for fraction in fractions]
+    return np.array(list(dict.fromkeys(indices)))
 
-def get_line_union(lines: list[HorizontalLine]) -> list[HorizontalLine]:
-    """Merge horizontal lines into a minimal set of non-overlapping lines."""
-    if not lines:
-        return []
-
-    # Sort by start coordinate
-    sorted_lines = sorted(lines, key=lambda line: line.start)
-    merged_lines: list[HorizontalLine] = []
-    current = sorted_lines[0]
-
-    for line in sorted_lines[1:]:
-        if line.start <= current.end:
-            # Lines overlap, update end point
-            current = HorizontalLine(current.start, max(current.end, line.end))
-        else:
-            # No overlap, add current line and start new one
-            merged_lines.append(current)
-            current = line
-
-    merged_lines.append(current)
-    return merged_lines
-
-def do_circles_cover_unit_circle(circles: list[Circle], y: float) -> bool:
-    lines = [line for circle in circles for line in [get_horizontal_line(circle, y)] if line is not None]
-    union = get_line_union(lines)
+def covers_unit_circle_2(circles: list[Circle]) -> bool:
+    if not circles:
+        return False
 
-    unit_circle_line = get_horizontal_line(UNIT_CIRCLE, y)
+    circle_array = CircleArray.from_circles(circles)
+    cx, cy, r2 = circle_array.cx[:, None], circle_array.cy[:, None], circle_array.r2[:, None]
+    num_lines = math.ceil(2 / PRECISION.epsilon)
 
-    if unit_circle_line is None:
-        return True
-    
-    return any(union_line.start <= unit_circle_line.start and union_line.end >= unit_circle_line.end for union_line in union)
+    # Rows are circles and columns are the y values of the scanlines. A few coarse scanlines spread over the
+    # circle catch most gaps before sweeping all of them.
+    if not _covers_scanlines(cx, cy, r2, -1.0 + get_coarse_scanlines(num_lines) * PRECISION.epsilon):
+        return False
 
-def covers_unit_circle_2(circles: list[Circle]) -> bool:
-    y = -1.0
-    while y < 1:
-        if not do_circles_cover_unit_circle(circles, y):
+    for chunk_start in range(0, num_lines, SCANLINE_CHUNK_SIZE):
+        ys = -1.0 + np.arange(chunk_start, min(chunk_start + SCANLINE_CHUNK_SIZE, num_lines)) * PRECISION.epsilon
+        if not _covers_scanlines(cx, cy, r2, ys):
             return False
-        y += PRECISION.epsilon
 
     return True
 
-def is_point_covered(circle: Circle, x: float, y: float) -> bool:
-    return (x - circle.x) ** 2 + (y - circle.y) ** 2 <= circle.r ** 2
+@njit(cache=True)
+def _any_covers(cx: np.ndarray, cy: np.ndarray, r2: np.ndarray, candidates: np.ndarray, x: float, y: float) -> bool:
+    for i in candidates:
+        dx = x - cx[i]
+        dy = y - cy[i]
+        if dx * dx + dy * dy <= r2[i]:
+            return True
+    return False
+
+@njit(cache=True)
+def _any_fully_covers(cx: np.ndarray, cy: np.ndarray, r2: np.ndarray, candidates: np.ndarray, x0: float, y0: float, x1: float, y1: float) -> bool:
+    for i in candidates:
+        # A circle covers the square exactly when it covers the corner farthest from its center
+        dx = max(abs(x0 - cx[i]), abs(x1 - cx[i]))
+        dy = max(abs(y0 - cy[i]), abs(y1 - cy[i]))
+        if dx * dx + dy * dy <= r2[i]:
+            return True
+    return False
+
+@njit(cache=True)
+def _filter_candidates(bounds: np.ndarray, candidates: np.ndarray, x0: float, y0: float, x1: float, y1: float, out: np.ndarray) -> int:
+    """Write the candidates whose bounding box intersects the square to out and return how many there are."""
+    count = 0
+    for i in candidates:
+        if bounds[2, i] >= x0 and bounds[0, i] <= x1 and bounds[3, i] >= y0 and bounds[1, i] <= y1:
+            out[count] = i
+            count += 1
+    return count
+
+# When a square is subdivided its corners and the corners of its four sub-squares form a 3x3 grid of points.
+# Point (gx, gy) of the grid is stored in bit gx + 3 * gy of a grid mask, and corner (a, b) of a square in bit
+# a + 2 * b of a corner mask. Only the five points that are not corners of the parent square need to be tested.
+GRID_POINTS = ((0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1), (0, 2), (1, 2), (2, 2))
+GRID_MIDPOINTS = ((1, 0), (0, 1), (1, 1), (2, 1), (1, 2))
+SUBSQUARE_OFFSETS = ((0, 0), (1, 0), (0, 1), (1, 1))
+
+@njit(cache=True)
+def _spread_corners(corners: int) -> int:
+    """Place a corner mask at the corners of a grid mask."""
+    return (corners & 1) | ((corners >> 1) & 1) << 2 | ((corners >> 2) & 1) << 6 | ((corners >> 3) & 1) << 8
+
+@njit(cache=True)
+def _get_subsquare_corners(grid: int, i: int, j: int) -> int:
+    """Get the corner mask of sub-square (i, j) from a grid mask."""
+    p = i + 3 * j
+    return ((grid >> p) & 1) | ((grid >> (p + 1)) & 1) << 1 | ((grid >> (p + 3)) & 1) << 2 | ((grid >> (p + 4)) & 1) << 3
+
+@njit(cache=True)
+def _evaluate_grid(cx: np.ndarray, cy: np.ndarray, r2: np.ndarray, candidates: np.ndarray, x: float, y: float, half: float,
+                   points: tuple[tuple[int, int], ...], inside: int, uncovered: int) -> tuple[int, int]:
+    """Set the grid mask bits of the given points that are inside the unit circle, and of those that are also uncovered."""
+    for gx, gy in points:
+        px = x + gx * half
+        py = y + gy * half
+        if px * px + py * py <= 1.0:
+            bit = 1 << (gx + 3 * gy)
+            inside |= bit
+            if not _any_covers(cx, cy, r2, candidates, px, py):
+                uncovered |= bit
+    return inside, uncovered
+
+@njit(cache=True)
+def _count_corners(corners: int) -> int:
+    return (corners & 1) + ((corners >> 1) & 1) + ((corners >> 2) & 1) + ((corners >> 3) & 1)
+
+@njit(cache=True)
+def _get_root_nodes(cx: np.ndarray, cy: np.ndarray, r2: np.ndarray, x: float, y: float, side: float,
+                    split: bool) -> tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+    """Get the nodes a quadtree search over square (x, y, side) starts from as their depth and (ix, iy) index rows,
+    with their inside and uncovered corner masks. With split these are its four sub-squares, bottom left, top left,
+    bottom right, top right."""
+    candidates = np.arange(cx.shape[0])
+
+    if not split:
+        # The corners of the square are evaluated on a grid spaced by its side, which places them at the corners
+        # of sub-square (0, 0)
+        inside, uncovered = _evaluate_grid(cx, cy, r2, candidates, x, y, side, SUBSQUARE_OFFSETS, 0, 0)
+        indices = np.zeros((1, 2), dtype=np.int64)
+        roots_inside = np.full(1, _get_subsquare_corners(inside, 0, 0))
+        roots_uncovered = np.full(1, _get_subsquare_corners(uncovered, 0, 0))
+        return 0, indices, roots_inside, roots_uncovered
+
+    inside, uncovered = _evaluate_grid(cx, cy, r2, candidates, x, y, side / 2, GRID_POINTS, 0, 0)
+    indices = np.empty((4, 2), dtype=np.int64)
+    roots_inside = np.empty(4, dtype=np.int64)
+    roots_uncovered = np.empty(4, dtype=np.int64)
+    for k, (i, j) in enumerate(((0, 0), (0, 1), (1, 0), (1, 1))):
+        indices[k, 0] = i
+        indices[k, 1] = j
+        roots_inside[k] = _get_subsquare_corners(inside, i, j)
+        roots_uncovered[k] = _get_subsquare_corners(uncovered, i, j)
+    return 1, indices, roots_inside, roots_uncovered
+
+@njit(cache=True)
+def _subdivide(cx: np.ndarray, cy: np.ndarray, r2: np.ndarray, bounds: np.ndarray, parent_candidates: np.ndarray,
+               x0: float, y0: float, s: float, corners_inside: int, corners_uncovered: int, eps: float,
+               out: np.ndarray) -> tuple[int, bool, int, int]:
+    """Write the parent candidates overlapping the square to out, then evaluate the grid of its sub-squares unless a
+    single circle covers it or it is too small to subdivide. Returns the number of candidates written, whether the
+    square was subdivided, and its inside and uncovered grid masks."""
+    count = _filter_candidates(bounds, parent_candidates, x0, y0, x0 + s, y0 + s, out)
+    overlapping = out[:count]
 
-def is_point_covered_by_any(circles: list[Circle], x: float, y: float) -> bool:
-    return any(is_point_covered(circle, x, y) for circle in circles)
-
-def is_fully_covered(square: Square, circle: Circle) -> bool:
-    return is_point_covered(circle, square.x, square.y) and \
-            is_point_covered(circle, square.x + square.side_length, square.y) and \
-            is_point_covered(circle, square.x, square.y + square.side_length) and \
-            is_point_covered(circle, square.x + square.side_length, square.y + square.side_length)
-
-def is_square_covered(circles: list[Circle], square: Square) -> bool:
-    x, y = square.x, square.y
-    side_length = square.side_length
-    corners = [(x, y), (x + side_length, y), (x, y + side_length), (x + side_length, y + side_length)]
-    
-    num_outside_unit_circle = sum(1 for corner in corners if not is_point_covered(UNIT_CIRCLE, *corner))
-    
-    if num_outside_unit_circle == 4:
-        return True
-        
-    # Check if any point inside unit circle is not covered
-    for corner in corners:
-        if is_point_covered(UNIT_CIRCLE, *corner) and not is_point_covered_by_any(circles, *corner):
-            return False
-            
     # Check if square is entirely covered by any circle
-    if any(is_fully_covered(square, circle) for circle in circles):
-        return True
-
-    # Recurse into four sub-quadrants
-    new_side_length = square.side_length / 2
-
-    if new_side_length < PRECISION.epsilon:
-        return True
-
-    subsquares = [
-        Square(x, y, new_side_length),
-        Square(x + new_side_length, y, new_side_length),
-        Square(x, y + new_side_length, new_side_length),
-        Square(x + new_side_length, y + new_side_length, new_side_length)
-    ]
-    return all(is_square_covered(circles, subsquare) for subsquare in subsquares)
-
-def get_all_uncovered_squares(circles: list[Circle]) -> Generator[Square, None, None]:
-    def get_uncovered_squares(square: Square) -> Generator[Square, None, None]:
-        x, y = square.x, square.y
-        side_length = square.side_length
-        corners = [(x, y), (x + side_length, y), (x, y + side_length), (x + side_length, y + side_length)]
-
-        num_outside_unit_circle = sum(1 for corner in corners if not is_point_covered(UNIT_CIRCLE, *corner))
-
-        if num_outside_unit_circle == 4:
-            return
-        
-        num_uncovered_corners = sum(1 for corner in corners if is_point_covered(UNIT_CIRCLE, *corner) and not is_point_covered_by_any(circles, *corner))
-
-        if num_uncovered_corners > 3:
-            yield square
-            return
-
-        if num_uncovered_corners == 0 and any(is_fully_covered(square, circle) for circle in circles):
-            return
-
-        new_side_length = square.side_length / 2
-
-        if new_side_length < PRECISION.epsilon:
-            return
-
-        subsquares = [
-            Square(x, y, new_side_length),
-            Square(x + new_side_length, y, new_side_length),
-            Square(x, y + new_side_length, new_side_length),
-            Square(x + new_side_length, y + new_side_length, new_side_length)
-        ]
-        for subsquare in subsquares:
-            yield from get_uncovered_squares(subsquare)
-
-    yield from get_uncovered_squares(Square(-1.0, -1.0, 1.0))
-    yield from get_uncovered_squares(Square(-1.0, 0.0, 1.0))
-    yield from get_uncovered_squares(Square(0.0, -1.0, 1.0))
-    yield from get_uncovered_squares(Square(0.0, 0.0, 1.0))
-
-def get_biggest_uncovered_square(circles: list[Circle]):
-    # use BFS instead of DFS, first square found is guaranteed to be the biggest
-
-    q = deque([Square(-1.0, -1.0, 1.0), Square(-1.0, 0.0, 1.0),
-               Square(0.0, -1.0, 1.0), Square(0.0, 0.0, 1.0)])
-    
-    while q:
-        square = q.popleft()
-
-        x, y = square.x, square.y
-        side_length = square.side_length
-        corners = [(x, y), (x + side_length, y), (x, y + side_length), (x + side_length, y + side_length)]
-
-        num_outside_unit_circle = sum(1 for corner in corners if not is_point_covered(UNIT_CIRCLE, *corner))
-
-        if num_outside_unit_circle == 4:
+    if corners_uncovered == 0 and _any_fully_covers(cx, cy, r2, overlapping, x0, y0, x0 + s, y0 + s):
+        return count, False, 0, 0
+
+    half = s / 2
+    if half < eps:
+        return count, False, 0, 0
+
+    inside, uncovered = _evaluate_grid(cx, cy, r2, overlapping, x0, y0, half, GRID_MIDPOINTS,
+                                       _spread_corners(corners_inside), _spread_corners(corners_uncovered))
+    return count, True, inside, uncovered
+
+@njit(cache=True)
+def _find_uncovered_squares(cx: np.ndarray, cy: np.ndarray, r2: np.ndarray, bounds: np.ndarray, x: float, y: float, side: float,
+                            split: bool, eps: float, stop_at_uncovered: bool) -> np.ndarray:
+    """Depth-first search the quadtree over square (x, y, side) for the squares whose four corners are inside the unit
+    circle and uncovered, which are not subdivided further. Returns them as (x, y, side) rows in DFS order.
+    With stop_at_uncovered, return as soon as any point inside the unit circle is found uncovered, with the square
+    being expanded as the only row."""
+    root_depth, root_indices, roots_inside, roots_uncovered = _get_root_nodes(cx, cy, r2, x, y, side, split)
+    num_roots = root_indices.shape[0]
+    found = np.empty((16, 3))
+
+    max_depth = root_depth
+    s = side / (1 << root_depth)
+    while s / 2 >= eps:
+        s /= 2
+        max_depth += 1
+
+    if stop_at_uncovered:
+        s = side / (1 << root_depth)
+        for k in range(num_roots):
+            if roots_uncovered[k]:
+                found[0, 0] = x + root_indices[k, 0] * s
+                found[0, 1] = y + root_indices[k, 1] * s
+                found[0, 2] = s
+                return found[:1].copy()
+
+    # Row d + 1 holds the circles overlapping the node at depth d currently being expanded. A node's
+    # candidates are a subset of its parent's, and DFS finishes a node's subtree before overwriting its row.
+    n = cx.shape[0]
+    candidates = np.empty((max_depth + 2, n), dtype=np.int64)
+    num_candidates = np.empty(max_depth + 2, dtype=np.int64)
+    candidates[root_depth, :] = np.arange(n)
+    num_candidates[root_depth] = n
+
+    # DFS with explicit stacks of nodes and their corner masks; each pop pushes at most 4 children. A node is its
+    # depth d and (ix, iy) index, with bottom left (x + ix * s, y + iy * s) and side s = side / 2^d.
+    # Roots and children are pushed in reverse so that they are visited in order.
+    size = num_roots + 3 * (max_depth - root_depth) + 4
+    stack_depth = np.empty(size, dtype=np.int64)
+    stack_ix = np.empty(size, dtype=np.int64)
+    stack_iy = np.empty(size, dtype=np.int64)
+    stack_inside = np.empty(size, dtype=np.int64)
+    stack_uncovered = np.empty(size, dtype=np.int64)
+    top = 0
+    for k in range(num_roots - 1, -1, -1):
+        stack_depth[top] = root_depth
+        stack_ix[top] = root_indices[k, 0]
+        stack_iy[top] = root_indices[k, 1]
+        stack_inside[top] = roots_inside[k]
+        stack_uncovered[top] = roots_uncovered[k]
+        top += 1
+
+    num_found = 0
+
+    while top > 0:
+        top -= 1
+        corners_inside = stack_inside[top]
+        corners_uncovered = stack_uncovered[top]
+
+        if corners_inside == 0:
             continue
 
-        num_uncovered_corners = sum(1 for corner in corners if is_point_covered(UNIT_CIRCLE, *corner) and not is_point_covered_by_any(circles, *corner))
-
-        if num_uncovered_corners > 3:
-            return square
-        
-        if num_uncovered_corners == 0 and any(is_fully_covered(square, circle) for circle in circles):
+        d = stack_depth[top]
+        ix = stack_ix[top]
+        iy = stack_iy[top]
+        s = side / (1 << d)
+        x0 = x + ix * s
+        y0 = y + iy * s
+
+        if _count_corners(corners_uncovered) == 4:
+            if num_found == found.shape[0]:
+                grown = np.empty((2 * found.shape[0], 3))
+                grown[:num_found] = found
+                found = grown
+            found[num_found, 0] = x0
+            found[num_found, 1] = y0
+            found[num_found, 2] = s
+            num_found += 1
             continue
 
-        new_side_length = square.side_length / 2
-
-        if new_side_length < PRECISION.epsilon:
+        count, subdivided, inside, uncovered = _subdivide(cx, cy, r2, bounds, candidates[d, :num_candidates[d]], x0, y0, s,
+                                                          corners_inside, corners_uncovered, eps, candidates[d + 1])
+        num_candidates[d + 1] = count
+        if not subdivided:
             continue
 
-        subsquares = [
-            Square(x, y, new_side_length),
-            Square(x + new_side_length, y, new_side_length),
-            Square(x, y + new_side_length, new_side_length),
-            Square(x + new_side_length, y + new_side_length, new_side_length)
-        ]
-
-        q.extend(subsquares)
+        # Check if any new point inside unit circle is not covered
+        if stop_at_uncovered and uncovered:
+            found[0, 0] = x0
+            found[0, 1] = y0
+            found[0, 2] = s
+            return found[:1].copy()
 
-    return None
+        for k in range(3, -1, -1):
+            i, j = SUBSQUARE_OFFSETS[k]
+            stack_depth[top] = d + 1
+            stack_ix[top] = 2 * ix + i
+            stack_iy[top] = 2 * iy + j
+            stack_inside[top] = _get_subsquare_corners(inside, i, j)
+            stack_uncovered[top] = _get_subsquare_corners(uncovered, i, j)
+            top += 1
 
-def get_biggest_semicovered_square(circles: list[Circle]):
-    # use BFS instead of DFS, first square found is guaranteed to be the biggest
-
-    q = deque([Square(-1.0, -1.0, 1.0), Square(-1.0, 0.0, 1.0),
-               Square(0.0, -1.0, 1.0), Square(0.0, 0.0, 1.0)])
-    
-    while q:
-        square = q.popleft()
-
-        x, y = square.x, square.y
-        side_length = square.side_length
-        corners = [(x, y), (x + side_length, y), (x, y + side_length), (x + side_length, y + side_length)]
-
-        num_outside_unit_circle = sum(1 for corner in corners if not is_point_covered(UNIT_CIRCLE, *corner))
-
-        if num_outside_unit_circle == 4:
-            continue
+    return found[:num_found].copy()
 
-        num_uncovered_corners = sum(1 for corner in corners if is_point_covered(UNIT_CIRCLE, *corner) and not is_point_covered_by_any(circles, *corner))
+def is_square_covered(circles: list[Circle], square: Square) -> bool:
+    circle_array = CircleArray.from_circles(circles)
+    uncovered = _find_uncovered_squares(circle_array.cx, circle_array.cy, circle_array.r2, circle_array.bounds,
+                                        square.x, square.y, square.side_length, False, PRECISION.epsilon, True)
+    return len(uncovered) == 0
 
-        if num_uncovered_corners > 0:
-            return square
-        
-        if num_uncovered_corners == 0 and any(is_fully_covered(square, circle) for circle in circles):
+def get_all_uncovered_squares(circles: list[Circle]) -> Generator[Square, None, None]:
+    circle_array = CircleArray.from_circles(circles)
+    squares = _find_uncovered_squares(circle_array.cx, circle_array.cy, circle_array.r2, circle_array.bounds,
+                                      -1.0, -1.0, 2.0, True, PRECISION.epsilon, False)
+
+    for x, y, side_length in squares.tolist():
+        yield Square(x, y, side_length)
+
+@njit(cache=True)
+def _grow_ring(buffer: np.ndarray, head: int, tail: int) -> np.ndarray:
+    """Double the capacity of a ring buffer, moving the items from head to tail to the front."""
+    mask = buffer.shape[0] - 1
+    grown = np.empty(2 * buffer.shape[0], dtype=buffer.dtype)
+    for k in range(head, tail):
+        grown[k - head] = buffer[k & mask]
+    return grown
+
+@njit(cache=True)
+def _get_biggest_square(cx: np.ndarray, cy: np.ndarray, r2: np.ndarray, bounds: np.ndarray, eps: float, min_uncovered_corners: int) -> tuple[bool, float, float, float]:
+    # use BFS instead of DFS, first square found is guaranteed to be the biggest
+    # The queue is a ring buffer of parallel arrays with a power of two capacity; head and tail only ever
+    # increase and are wrapped with mask when indexing
+    root_depth, root_indices, roots_inside, roots_uncovered = _get_root_nodes(cx, cy, r2, -1.0, -1.0, 2.0, True)
+    root_side = 2.0 / (1 << root_depth)
+    capacity = 64
+    mask = capacity - 1
+    queue_x = np.empty(capacity)
+    queue_y = np.empty(capacity)
+    queue_side = np.empty(capacity)
+    queue_inside = np.empty(capacity, dtype=np.int64)
+    queue_uncovered = np.empty(capacity, dtype=np.int64)
+
+    # Each queued square points at the slice of the arena holding the circles overlapping its parent.
+    # Squares are expanded in queue order, so the slices still in use always form a suffix of the arena.
+    n = cx.shape[0]
+    arena = np.empty(max(64, 4 * n), dtype=np.int64)
+    arena[:n] = np.arange(n)
+    arena_tail = n
+    queue_start = np.empty(capacity, dtype=np.int64)
+    queue_count = np.empty(capacity, dtype=np.int64)
+
+    tail = 0
+    for k in range(root_indices.shape[0]):
+        queue_x[tail] = -1.0 + root_indices[k, 0] * root_side
+        queue_y[tail] = -1.0 + root_indices[k, 1] * root_side
+        queue_side[tail] = root_side
+        queue_inside[tail] = roots_inside[k]
+        queue_uncovered[tail] = roots_uncovered[k]
+        queue_start[tail] = 0
+        queue_count[tail] = n
+        tail += 1
+    head = 0
+
+    while head < tail:
+        slot = head & mask
+        x0 = queue_x[slot]
+        y0 = queue_y[slot]
+        s = queue_side[slot]
+        corners_inside = queue_inside[slot]
+        corners_uncovered = queue_uncovered[slot]
+        parent_start = queue_start[slot]
+        parent_count = queue_count[slot]
+        head += 1
+
+        if corners_inside == 0:
             continue
 
-        new_side_length = square.side_length / 2
-
-        if new_side_length < PRECISION.epsilon:
+        if _count_corners(corners_uncovered) >= min_uncovered_corners:
+            return True, x0, y0, s
+
+        if arena_tail + parent_count > arena.shape[0]:
+            # Drop the slices no longer referenced by the queue, and double the capacity if that is not enough
+            arena[:arena_tail - parent_start] = arena[parent_start:arena_tail]
+            arena_tail -= parent_start
+            for k in range(head, tail):
+                queue_start[k & mask] -= parent_start
+            parent_start = 0
+            if arena_tail + parent_count > arena.shape[0]:
+                grown_arena = np.empty(2 * arena.shape[0], dtype=np.int64)
+                grown_arena[:arena_tail] = arena[:arena_tail]
+                arena = grown_arena
+
+        start = arena_tail
+        count, subdivided, inside, uncovered = _subdivide(cx, cy, r2, bounds, arena[parent_start:parent_start + parent_count], x0, y0, s,
+                                                          corners_inside, corners_uncovered, eps, arena[start:])
+        arena_tail += count
+        if not subdivided:
             continue
 
-        subsquares = [
-            Square(x, y, new_side_length),
-            Square(x + new_side_length, y, new_side_length),
-            Square(x, y + new_side_length, new_side_length),
-            Square(x + new_side_length, y + new_side_length, new_side_length)
-        ]
-
-        q.extend(subsquares)
+        if tail - head + 4 > capacity:
+            queue_x = _grow_ring(queue_x, head, tail)
+            queue_y = _grow_ring(queue_y, head, tail)
+            queue_side = _grow_ring(queue_side, head, tail)
+            queue_inside = _grow_ring(queue_inside, head, tail)
+            queue_uncovered = _grow_ring(queue_uncovered, head, tail)
+            queue_start = _grow_ring(queue_start, head, tail)
+            queue_count = _grow_ring(queue_count, head, tail)
+            capacity *= 2
+            mask = capacity - 1
+            tail -= head
+            head = 0
+
+        half = s / 2
+        for i, j in SUBSQUARE_OFFSETS:
+            slot = tail & mask
+            queue_x[slot] = x0 + i * half
+            queue_y[slot] = y0 + j * half
+            queue_side[slot] = half
+            queue_inside[slot] = _get_subsquare_corners(inside, i, j)
+            queue_uncovered[slot] = _get_subsquare_corners(uncovered, i, j)
+            queue_start[slot] = start
+            queue_count[slot] = count
+            tail += 1
+
+    return False, 0.0, 0.0, 0.0
+
+def get_row_sample_ranges(axis: np.ndarray, centers: np.ndarray, half_widths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Get the half-open index ranges of the samples of axis within half_widths of centers. A NaN half width gives
+    an empty range at index 0."""
+    starts = np.searchsorted(axis, centers - half_widths, side='left')
+    ends = np.searchsorted(axis, centers + half_widths, side='right')
+    empty = np.isnan(half_widths)
+    starts[empty] = 0
+    ends[empty] = 0
+    return starts, ends
+
+def count_uncovered_samples(circles: list[Circle]) -> int | None:
+    """Count the samples of the PRECISION raster grid that are inside the unit circle and not covered by any circle.
+    Each row of the grid is integrated as the union of the sample ranges the circles cover on it.
+    Returns None if epsilon is too fine to rasterize."""
+    axis = PRECISION.get_raster_axis()
+    if axis is None:
+        return None
 
-    return None
+    # Rows are circles and columns are the y values of the grid rows
+    circle_array = CircleArray.from_circles(circles)
+    cx, cy, r2 = circle_array.cx[:, None], circle_array.cy[:, None], circle_array.r2[:, None]
+
+    with np.errstate(invalid='ignore'):
+        unit_starts, unit_ends = get_row_sample_ranges(axis, np.zeros_like(axis), np.sqrt(1 - axis * axis))
+        dy = axis - cy
+        starts, ends = get_row_sample_ranges(axis, np.broadcast_to(cx, dy.shape), np.sqrt(r2 - dy * dy))
+
+    # Clip the ranges to the unit circle, moving the empty ones to its start so they never extend the sweep
+    starts = np.maximum(starts, unit_starts)
+    ends = np.minimum(ends, unit_ends)
+    empty = starts >= ends
+    starts[empty] = unit_starts[np.nonzero(empty)[1]]
+    ends[empty] = starts[empty]
+
+    # Sweep the ranges by start, where each one only adds the samples past the furthest end reached before it
+    order = np.argsort(starts, axis=0)
+    starts = np.take_along_axis(starts, order, axis=0)
+    ends = np.take_along_axis(ends, order, axis=0)
+    reach = np.maximum.accumulate(np.vstack([unit_starts, ends[:-1]]), axis=0)
+    covered = np.maximum(ends - np.maximum(starts, reach), 0).sum()
+
+    return int((unit_ends - unit_starts).sum() - covered)
+
+def get_biggest_uncovered_square(circles: list[Circle]) -> Square | None:
+    """Get the biggest square whose four corners are inside the unit circle and uncovered."""
+    circle_array = CircleArray.from_circles(circles)
+    found, x, y, side_length = _get_biggest_square(circle_array.cx, circle_array.cy, circle_array.r2, circle_array.bounds,
+                                                   PRECISION.epsilon, 4)
+
+    return Square(x, y, side_length) if found else None
+
+def get_biggest_semicovered_square(circles: list[Circle]) -> Square | None:
+    """Get the biggest square with at least one uncovered corner inside the unit circle."""
+    circle_array = CircleArray.from_circles(circles)
+    found, x, y, side_length = _get_biggest_square(circle_array.cx, circle_array.cy, circle_array.r2, circle_array.bounds,
+                                                   PRECISION.epsilon, 1)
+
+    return Square(x, y, side_length) if found else None
+
+@functools.lru_cache(maxsize=1024)
+def _covers_unit_circle(_version: int, circles: tuple[Circle, ...]) -> bool:
+    circle_array = CircleArray.from_circles(list(circles))
+    uncovered = _find_uncovered_squares(circle_array.cx, circle_array.cy, circle_array.r2, circle_array.bounds,
+                                        -1.0, -1.0, 2.0, True, PRECISION.epsilon, True)
+    return len(uncovered) == 0
 
 def covers_unit_circle(circles: list[Circle]) -> bool:
-    # (x, y) are the bottom left coordinates of the square
-    return all(is_square_covered(circles, Square(x, y, 1.0)) 
-              for x, y in [(-1.0, -1.0), (-1.0, 0.0), (0.0, -1.0), (0.0, 0.0)])
+    # Binary search evaluations can place the same circles more than once, and coverage does not depend on their order
+    return _covers_unit_circle(PRECISION.version, tuple(sorted(circles)))
 
 def binary_search(
     start: float,
@@ -390,11 +743,56 @@ def binary_search(
 
     return smallest_success, smallest_success_circles
 
+def get_polygon_cell_overlap(parameters: np.ndarray, bounds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Given circle polygon parameters as rows and x_min, y_min, x_max, y_max cell bounds as rows, get masks of
+    which cells each circle polygon certainly contains and which it may reach. Rows are circles and columns are cells."""
+    x, y, r, quad_segs = parameters.reshape(-1, 4).T[..., None]
+    x_min, y_min, x_max, y_max = bounds
+
+    far_dx = np.maximum(np.abs(x_min - x), np.abs(x_max - x))
+    far_dy = np.maximum(np.abs(y_min - y), np.abs(y_max - y))
+    near_dx = np.maximum(np.maximum(x_min - x, x - x_max), 0)
+    near_dy = np.maximum(np.maximum(y_min - y, y - y_max), 0)
+
+    # Each circle polygon contains the disk through its edge midpoints and is contained in the disk through its vertices
+    inner_r = r * np.cos(np.pi / (4 * quad_segs))
+    contains = far_dx * far_dx + far_dy * far_dy <= inner_r * inner_r
+    reaches = near_dx * near_dx + near_dy * near_dy < r * r
+
+    return contains, reaches
+
+def is_uncovered_area_small(circles: list[Circle]) -> bool:
+    """Check whether the area of the unit circle polygon outside the circle polygons is less than epsilon.
+    The unit circle is split into grid cells, and only the cells that are neither contained in a single circle
+    polygon nor missed by all of them are overlaid, with just the circles that reach them."""
+    cells, bounds, areas = PRECISION.get_unit_circle_cells()
+    parameters = np.array([PRECISION.get_polygon_parameters(circle) for circle in circles])
+    contains, reaches = get_polygon_cell_overlap(parameters, bounds)
+
+    reached = reaches.any(axis=0)
+    uncovered_area = areas[~reached].sum()
+    if uncovered_area >= PRECISION.epsilon:
+        return False
+
+    uncertain = reached & ~contains.any(axis=0)
+    if not uncertain.any():
+        return True
+
+    nearby = reaches[:, uncertain].any(axis=1)
+    circle_polygons = [PRECISION.get_circle_polygon(circle) for circle, is_nearby in zip(circles, nearby) if is_nearby]
+    diff = shapely.union_all(cells[uncertain]).difference(shapely.union_all(circle_polygons))
+
+    return bool(uncovered_area + diff.area < PRECISION.epsilon)
+
 def covers_unit_circle_3(circles: list[Circle]) -> bool:
-    circle_polygons = [PRECISION.get_circle_polygon(circle) for circle in circles]
-    diff = PRECISION.unit_circle_polygon.difference(shapely.union_all(circle_polygons)) # type: ignore
+    num_uncovered = count_uncovered_samples(circles)
 
-    return diff.area < PRECISION.epsilon
+    if num_uncovered is None:
+        # epsilon is too fine to rasterize, fall back to the polygon overlay
+        return is_uncovered_area_small(circles)
+
+    # Each sample stands for an epsilon by epsilon cell of uncovered area
+    return num_uncovered * PRECISION.epsilon ** 2 < PRECISION.epsilon
 
 def get_distance_traveled(circles: list[Circle], debug: bool = False):
     # D(n) = max(dist to get to kth circle + D(r_k * n))
@@ -406,18 +804,22 @@ def get_distance_traveled(circles: list[Circle], debug: bool = False):
 
     max_ct = 0
 
-    for circle in circles:
-        x, y, r = circle
-        distance_to_circle: float = math.sqrt((x - current_point[0]) ** 2 + (y - current_point[1]) ** 2)
+    first_distance = math.hypot(circles[0].x, circles[0].y) if circles else 0
+
+    last_index = len(circles) - 1
+
+    for i, circle in enumerate(circles):
+        x, y, r = circle.x, circle.y, circle.r
+        distance_to_circle: float = math.hypot(x - current_point[0], y - current_point[1])
         
-        if circle == circles[-1]:
+        if i == last_index:
             # Don't need to necessarily travel to center of the last circle, since we are guaranteed that it is there.
             # Only need to travel to first probe point of the next layer
 
             # -1 * sqrt(x^2 + y^2) * r is for getting to the first probe of the next guy.
             # the second sqrt(x^2 + y^2) * r is for the next layer not needing to
             # traverse that distance to get to its first probe
-            distance_to_circle -= 2 * math.sqrt(circles[0].x**2 + circles[0].y**2) * r
+            distance_to_circle -= 2 * first_distance * r
 
 
         distance += distance_to_circle
@@ -425,7 +827,7 @@ def get_distance_traveled(circles: list[Circle], debug: bool = False):
         ct = distance / (1 - r)
 
         if debug:
-            print(f"Circle {circles.index(circle) + 1}: {distance}, {r} => {ct}") 
+            print(f"Circle {i + 1}: {distance}, {r} => {ct}") 
 
         max_ct = max(max_ct, ct)
         current_point = (x, y)
@@ -448,29 +850,32 @@ def get_intersections(circle1: Circle, circle2: Circle):
     x0, y0, r0 = circle1.x, circle1.y, circle1.r
     x1, y1, r1 = circle2.x, circle2.y, circle2.r
 
-    # Calculate distance between circle centers
-    d = math.sqrt((x1-x0)**2 + (y1-y0)**2)
+    # Calculate squared distance between circle centers
+    dx, dy = x1-x0, y1-y0
+    d2 = dx*dx + dy*dy
+    r_sum, r_diff = r0 + r1, r0 - r1
     
     # Check intersection conditions
-    if d > r0 + r1:  # Non intersecting
+    if d2 > r_sum*r_sum:  # Non intersecting
         return None
-    if d < abs(r0-r1):  # One circle within other
+    if d2 < r_diff*r_diff:  # One circle within other
         return None
-    if d == 0 and r0 == r1:  # Coincident circles
+    if d2 == 0 and r0 == r1:  # Coincident circles
         return None
 
     # Calculate intersection points
-    a = (r0**2 - r1**2 + d**2)/(2*d)
-    h = math.sqrt(r0**2 - a**2)
+    d = math.sqrt(d2)
+    a = (circle1.r2 - circle2.r2 + d2)/(2*d)
+    h = math.sqrt(circle1.r2 - a*a)
     
-    x2 = x0 + a*(x1-x0)/d   
-    y2 = y0 + a*(y1-y0)/d   
+    x2 = x0 + a*dx/d   
+    y2 = y0 + a*dy/d   
     
-    x3 = x2 + h*(y1-y0)/d     
-    y3 = y2 - h*(x1-x0)/d 
+    x3 = x2 + h*dy/d     
+    y3 = y2 - h*dx/d 
 
-    x4 = x2 - h*(y1-y0)/d
-    y4 = y2 + h*(x1-x0)/d
+    x4 = x2 - h*dy/d
+    y4 = y2 + h*dx/d
     
     return ((x3, y3), (x4, y4))
 
@@ -488,14 +893,11 @@ def rotate_circles(circles: list[Circle]):
     # get angle to rotate, angle from x y to origin
     angle = math.atan2(y, x)
 
-    rotated_circles: list[Circle] = []
-    for circle in circles:
-        x, y = circle.x, circle.y
-        r = circle.r
+    cos, sin = math.cos(angle), math.sin(angle)
+    rotation = np.array([[cos, -sin], [sin, cos]])
 
-        new_x = x * math.cos(angle) - y * math.sin(angle)
-        new_y = x * math.sin(angle) + y * math.cos(angle)
+    # Rotate all centers at once, then reflect over the x axis
+    centers = np.array([(circle.x, circle.y) for circle in circles], dtype=np.float64) @ rotation.T
+    centers[:, 1] *= -1
 
-        rotated_circles.append(Circle(new_x, -new_y, r))
-    
-    return rotated_circles
+    return [Circle(x, y, circle.r) for (x, y), circle in zip(centers.tolist(), circles)]
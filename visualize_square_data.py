@@ -45,20 +45,18 @@ def visualize_square_data(data_file=None, output_dir=None):
         # - Scale down P by d * log2(n), where d is the dimension
         # - Scale down num_responses by d * log2(n)
         # - Scale down D by d * n
-        stats['P_mean_scaled'] = stats['P_mean'] / (stats['dims'] * np.log2(stats['n']))
-        stats['P_min_scaled'] = stats['P_min'] / (stats['dims'] * np.log2(stats['n']))
-        stats['P_max_scaled'] = stats['P_max'] / (stats['dims'] * np.log2(stats['n']))
-        stats['P_std_scaled'] = stats['P_std'] / (stats['dims'] * np.log2(stats['n']))
-
-        stats['num_responses_mean_scaled'] = stats['num_responses_mean'] / (stats['dims'] * np.log2(stats['n']))
-        stats['num_responses_min_scaled'] = stats['num_responses_min'] / (stats['dims'] * np.log2(stats['n']))
-        stats['num_responses_max_scaled'] = stats['num_responses_max'] / (stats['dims'] * np.log2(stats['n']))
-        stats['num_responses_std_scaled'] = stats['num_responses_std'] / (stats['dims'] * np.log2(stats['n']))
-
-        stats['D_mean_scaled'] = stats['D_mean'] / (stats['dims'] * stats['n'])
-        stats['D_min_scaled'] = stats['D_min'] / (stats['dims'] * stats['n'])
-        stats['D_max_scaled'] = stats['D_max'] / (stats['dims'] * stats['n'])
-        stats['D_std_scaled'] = stats['D_std'] / (stats['dims'] * stats['n'])
+        log_scaled_columns = [f'{metric}_{stat}' for metric in ('P', 'num_responses') for stat in ('mean', 'min', 'max', 'std')]
+        linear_scaled_columns = [f'D_{stat}' for stat in ('mean', 'min', 'max', 'std')]
+
+        # Compute each denominator once and scale all columns in one pass
+        dims = stats['dims'].to_numpy(dtype=float)
+        n = stats['n'].to_numpy(dtype=float)
+        denominators = np.repeat(np.stack([dims * np.log2(n), dims * n], axis=1),
+                                 [len(log_scaled_columns), len(linear_scaled_columns)], axis=1)
+
+        scaled_columns = log_scaled_columns + linear_scaled_columns
+        scaled = stats[scaled_columns].to_numpy(dtype=float) / denominators
+        stats = stats.assign(**{f'{column}_scaled': scaled[:, i] for i, column in enumerate(scaled_columns)})
 
         print("Added scaled metrics:")
         print("- P scaled by d * log2(n), where d is the dimension")